@@ -1,15 +1,22 @@
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder, PromptTemplate
-from langchain.schema.runnable import RunnablePassthrough, RunnableLambda
+from langchain.schema.runnable import RunnableLambda
 from langchain_core.output_parsers import JsonOutputParser, StrOutputParser
 
-from llms.openai import OpenAIChatModel, OpenAIChatConfig
+from llms.openai import OpenAIChatConfig
+from llms.router import chain_routers
 from memory.sqlite import GetMemory
-from utils.constants import CHAT_HISTORY_KEY, AGENT_SYSTEM_PROMPT, AGENT_INFER_PROMPT, MAX_HISTORY_MESSAGES
+from utils.constants import (
+    CHAT_HISTORY_KEY, AGENT_SYSTEM_PROMPT, AGENT_INFER_PROMPT, MAX_HISTORY_MESSAGES,
+    PROMPT_GENERATOR_TEMPLATE,
+)
 
 
-# Initialize the OpenAI chat model with custom configuration
+# Initialize the OpenAI chat model with custom configuration.
+# Each chain gets its own router over the primary model plus any
+# OPENAI_FALLBACK_MODELS, with its own fallback/hedging policy and latency
+# stats, so slow or failing providers don't stall a turn.
 config = OpenAIChatConfig(temperature=0.7)
-model = OpenAIChatModel(config)
+routers = chain_routers(config)
 
 
 # =============================
@@ -33,26 +40,21 @@ def get_conversation_chain(session_id: int):
     # Helper function: Retrieve limited chat history
     # ----------------------------
     def get_limited_history(_):
-        # Load chat history from memory
+        # Load chat history from memory, skipping blank rows written by older versions
         history = memory.load_memory_variables({}).get(CHAT_HISTORY_KEY, [])
+        history = [m for m in history if m.content.strip()]
         # Only return the most recent N messages (to limit token usage)
         return history[-MAX_HISTORY_MESSAGES:]
 
     # ----------------------------
     # Helper function: Save user message into memory
     # ----------------------------
-    def save_user_message(user_input):
-        # Extract the text content from different possible structures
-        if isinstance(user_input, dict):
-            user_text = user_input.get(
-                "input") or user_input.get("message") or ""
-        else:
-            user_text = str(user_input).strip()
-
-        # Save only non-empty messages to memory
+    def save_user_message(inputs):
+        # Save only non-empty messages to memory (no blank AI counterpart)
+        user_text = str(inputs.get("input") or "").strip()
         if user_text:
-            memory.save_context({"input": user_text}, {"output": ""})
-        return user_input
+            memory.chat_memory.add_user_message(user_text)
+        return inputs
 
     # ----------------------------
     # Helper function: Save AI message into memory
@@ -66,35 +68,38 @@ def get_conversation_chain(session_id: int):
 
         # Save only non-empty AI responses
         if ai_text:
-            memory.save_context({"input": ""}, {"output": ai_text})
+            memory.chat_memory.add_ai_message(ai_text)
         return ai_output
 
     """
     LCEL Chain Execution Flow:
     --------------------------
-    1. "input" → RunnableLambda(save_user_message)
-       - Saves user message to memory before processing.
+    1. "input" / "purpose" → taken from the invocation dict as plain strings.
     2. "chat_history" → RunnableLambda(get_limited_history)
-       - Fetches only the recent N chat messages for context.
-    3. "purpose" → RunnablePassthrough()
-       - Placeholder for future extensions (e.g., intent classification).
+       - Fetches the N most recent non-blank messages, before this turn.
+    3. RunnableLambda(save_user_message)
+       - Saves the user message to memory once history has been read.
     4. prompt → Combines system message, chat history, and input.
     5. model → Sends formatted message to LLM for response.
     6. RunnableLambda(save_ai_message)
        - Saves AI-generated output back into memory.
-    
+
+    The direct engine (agent/direct.py) builds the same messages: system
+    prompt, the same history window, then the user input.
+
     Overall pipeline:
-    user input → memory + context → prompt → LLM → AI response → memory update
+    user input → context → memory → prompt → LLM → AI response → memory update
     """
 
     chain = (
         {
-            "input": RunnableLambda(save_user_message),
+            "input": RunnableLambda(lambda x: x["input"]),
+            "purpose": RunnableLambda(lambda x: x["purpose"]),
             "chat_history": RunnableLambda(get_limited_history),
-            "purpose": RunnablePassthrough(),
         }
+        | RunnableLambda(save_user_message)
         | prompt
-        | model
+        | routers["conversation"]
         | RunnableLambda(save_ai_message)
     )
 
@@ -111,7 +116,7 @@ def get_infer_chain():
     # Define LCEL chain: prompt → LLM → structured JSON parser
     chain = (
         prompt
-        | model
+        | routers["inference"]
         | JsonOutputParser()  # Converts model output into JSON format
     )
 
@@ -126,7 +131,7 @@ def prompt_generator_chain():
     # Define a text template that instructs the model to generate
     # a short summary or one-liner based on a user-provided query.
     # The `{prompt}` variable will be replaced dynamically with the actual query at runtime.
-    template = "Generate a short summary or one-liner based on the following user query: {prompt}"
+    template = PROMPT_GENERATOR_TEMPLATE
 
     # Create a LangChain prompt object from the above template.
     # This object manages how input variables (like {prompt}) are formatted
@@ -140,7 +145,7 @@ def prompt_generator_chain():
     #   3. Return the model's generated output in string format.
     #
     # The `|` operator is LangChain's way of composing modular steps into a runnable pipeline.
-    chain = prompt_template | model | StrOutputParser()
+    chain = prompt_template | routers["prompt_generator"] | StrOutputParser()
 
     # Return the constructed chain so it can be invoked later
     # with specific input data (e.g., {"prompt": "Explain blockchain in one line"}).
@@ -0,0 +1,94 @@
+import json
+import re
+
+from llms.openai import OpenAIChatConfig
+from llms.direct import DirectChatModel
+from llms.router import chain_routers
+from memory.sqlite import LoadMessages, AppendMessages
+from utils.constants import (
+    AGENT_SYSTEM_PROMPT, AGENT_INFER_PROMPT, MAX_HISTORY_MESSAGES, PROMPT_GENERATOR_TEMPLATE,
+)
+
+
+# Same model settings and per-chain routers as the LangChain chains,
+# but routed over the shared HTTP client
+config = OpenAIChatConfig(temperature=0.7)
+routers = chain_routers(config, factory=DirectChatModel)
+
+# Map stored message types to OpenAI chat roles
+ROLES = {"human": "user", "ai": "assistant"}
+
+
+# =============================
+# JSON output parsing
+# =============================
+def parse_json_output(text: str):
+    """
+    Parse a JSON value from model output, tolerating ```json fences and
+    surrounding prose (mirrors what JsonOutputParser accepts in practice).
+    """
+    text = text.strip()
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", text, re.DOTALL)
+    if fenced:
+        text = fenced.group(1).strip()
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # Fall back to the outermost array/object embedded in the text
+        match = re.search(r"(\[.*\]|\{.*\})", text, re.DOTALL)
+        if not match:
+            raise
+        return json.loads(match.group(1))
+
+
+# =======================================
+# Get Agent Response (Main conversation)
+# =======================================
+async def get_agent_response(session_id: int, purpose: str, user_input: str):
+    # Same window as the LangChain chain: the N most recent non-blank
+    # messages, read before this turn's user message is stored
+    history = LoadMessages(session_id, limit=MAX_HISTORY_MESSAGES)
+
+    messages = [{"role": "system", "content": AGENT_SYSTEM_PROMPT.format(purpose=purpose)}]
+    messages += [{"role": ROLES[role], "content": content} for role, content in history]
+    messages.append({"role": "user", "content": user_input})
+
+    result = await routers["conversation"].ainvoke(messages)
+
+    # Persist both sides of the turn in one round trip
+    AppendMessages(session_id, [("human", user_input.strip()), ("ai", result.strip())])
+    return result
+
+
+# =======================================
+# Infer Interests (Extract structured insights)
+# =======================================
+async def get_infer_interests(session_id: int):
+    history = LoadMessages(session_id)
+    history_str = "\n".join(
+        [f"{'Human' if role == 'human' else 'AI'}: {content}" for role, content in history]
+    )
+
+    try:
+        prompt = AGENT_INFER_PROMPT.format(history=history_str)
+        result = await routers["inference"].ainvoke([{"role": "user", "content": prompt}])
+        return parse_json_output(result)
+
+    except Exception as e:
+        # Log and handle inference errors gracefully
+        print("Error inferring interests:", e)
+        return []
+
+
+# =============================
+# Short Prompt Generator
+# =============================
+async def prompt_generator(prompt):
+    try:
+        message = PROMPT_GENERATOR_TEMPLATE.format(prompt=prompt)
+        return await routers["prompt_generator"].ainvoke([{"role": "user", "content": message}])
+    except Exception as e:
+        # Log and handle prompt generation errors gracefully
+        err = f"Error generating prompt = {e}"
+        print("Error generating prompt:", e)
+        return err
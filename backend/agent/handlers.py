@@ -1,13 +1,27 @@
+import os
+from dotenv import load_dotenv
 from langchain_core.messages import HumanMessage
 
-from memory.sqlite import GetMemory
-from .chains import get_conversation_chain, get_infer_chain, prompt_generator_chain
+from memory.sqlite import GetMemory, LoadMessages
+from . import direct
+from .novelty import should_infer, gate_stats
+from .chains import routers, get_conversation_chain, get_infer_chain, prompt_generator_chain
+
+load_dotenv()
+
+# Which LLM engine serves requests:
+# - "langchain": LCEL chains + ConversationBufferMemory (default)
+# - "direct": plain OpenAI-compatible HTTP calls + our own history store
+LLM_ENGINE = os.getenv("LLM_ENGINE", "langchain").lower()
 
 
 # =======================================
 # Get Agent Response (Main conversation)
 # =======================================
 async def get_agent_response(session_id: int, purpose: str, user_input: str):
+    if LLM_ENGINE == "direct":
+        return await direct.get_agent_response(session_id, purpose, user_input)
+
     # Create a conversation chain tied to the current user session
     chain = get_conversation_chain(session_id)
 
@@ -24,6 +38,9 @@ async def get_agent_response(session_id: int, purpose: str, user_input: str):
 # Infer Interests (Extract structured insights)
 # =======================================
 async def get_infer_interests(session_id: int):
+    if LLM_ENGINE == "direct":
+        return await direct.get_infer_interests(session_id)
+
     # Retrieve chat memory object for the given session
     memory = GetMemory(session_id)
 
@@ -54,10 +71,33 @@ async def get_infer_interests(session_id: int):
         return []
 
 
+# =======================================
+# Novelty Gate (skip redundant inference calls)
+# =======================================
+def should_infer_interests(session_id: int, user_input: str, interests: list):
+    # Earlier non-empty user messages; the latest one is already saved by the chain
+    user_messages = [
+        content for role, content in LoadMessages(session_id) if role == "human"
+    ]
+    prior_messages = user_messages[:-1] if user_messages else []
+
+    run, _ = should_infer(
+        user_input, prior_messages, interests, turn=len(user_messages))
+    return run
+
+
+def get_gate_stats():
+    # Skipped vs. executed interest inference calls since startup
+    return dict(gate_stats)
+
+
 # =============================
 # Short Prompt Generator
 # =============================
 async def prompt_generator(prompt):
+    if LLM_ENGINE == "direct":
+        return await direct.prompt_generator(prompt)
+
     try:
         chain = prompt_generator_chain()
 
@@ -68,3 +108,12 @@ async def prompt_generator(prompt):
         err = f"Error generating prompt = {e}"
         print("Error generating prompt:", e)
         return err
+
+
+# =============================
+# LLM Route Metrics
+# =============================
+def get_route_stats():
+    # Per-chain, per-route latency percentiles and win counts (used to tune hedge delays)
+    engine_routers = direct.routers if LLM_ENGINE == "direct" else routers
+    return {chain: router.stats() for chain, router in engine_routers.items()}
@@ -0,0 +1,100 @@
+import os
+import re
+
+from utils.constants import (
+    NOVELTY_THRESHOLD, INFER_EVERY_N_TURNS, NOVELTY_STOPWORDS,
+)
+
+# Gate tuning, overridable from the environment
+novelty_threshold = float(os.getenv("NOVELTY_THRESHOLD", NOVELTY_THRESHOLD))
+infer_every_n_turns = int(os.getenv("INFER_EVERY_N_TURNS", INFER_EVERY_N_TURNS))
+
+# Process-wide counters for how often the gate skipped or ran inference
+gate_stats = {"executed": 0, "skipped": 0}
+
+
+# ============================================================
+# Keyword extraction
+# ============================================================
+def tokenize(text: str):
+    """Lowercase word tokens of a message."""
+    return re.findall(r"[a-z0-9']+", (text or "").lower())
+
+
+def extract_keywords(text: str):
+    """
+    Split text into lowercase content keywords.
+
+    Filler words are dropped and a trailing plural "s" is removed so that
+    "hikes" and "hike" count as the same keyword.
+    """
+    keywords = set()
+    for token in tokenize(text):
+        if token in NOVELTY_STOPWORDS or len(token) < 3:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        keywords.add(token)
+    return keywords
+
+
+# ============================================================
+# Novelty score
+# ============================================================
+def novelty_score(message: str, known: set):
+    """
+    Score how much new content a message adds.
+
+    The score is the number of keywords not seen before. Message length is
+    deliberately ignored: a one-word answer ("Photography") is real survey
+    signal, while acknowledgements ("absolutely!", "sounds good") are kept
+    out by NOVELTY_STOPWORDS.
+
+    Returns:
+        tuple[float, set]: The score and the new keywords.
+    """
+    new_keywords = extract_keywords(message) - known
+    return float(len(new_keywords)), new_keywords
+
+
+# ============================================================
+# Novelty gate: decide whether interest inference is worth running
+# ============================================================
+def should_infer(message: str, prior_messages: list, interests: list, turn: int,
+                 threshold: float = None):
+    """
+    Cheap local pre-check run before LLM interest inference.
+
+    Args:
+        message (str): Latest user message.
+        prior_messages (list): Earlier user messages in the session (plain text).
+        interests (list): Currently stored interests as dicts with "name"/"rationale".
+        turn (int): 1-based index of the latest user message in the session.
+        threshold (float): Minimum novelty score (defaults to NOVELTY_THRESHOLD).
+
+    Returns:
+        tuple[bool, float]: Whether to run inference, and the novelty score.
+    """
+    threshold = novelty_threshold if threshold is None else threshold
+
+    # Everything the session already "knows": earlier answers + stored interests
+    known = set()
+    for text in prior_messages:
+        known |= extract_keywords(text)
+    for interest in interests:
+        known |= extract_keywords(interest.get("name"))
+        known |= extract_keywords(interest.get("rationale"))
+
+    score, new_keywords = novelty_score(message, known)
+
+    run = (
+        # Nothing inferred yet — any content is worth a first pass
+        (not interests and bool(new_keywords))
+        # Message adds enough unseen content
+        or score >= threshold
+        # Periodic refresh so confidences keep tracking the conversation
+        or (infer_every_n_turns > 0 and turn % infer_every_n_turns == 0)
+    )
+
+    gate_stats["executed" if run else "skipped"] += 1
+    return run, score
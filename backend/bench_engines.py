@@ -0,0 +1,94 @@
+"""
+Side-by-side benchmark of the LangChain and direct LLM engines.
+
+Starts a fake OpenAI-compatible server on localhost (instant, canned replies)
+and a throwaway SQLite database, then replays the same conversation through
+both engines, so the numbers reflect engine overhead rather than the model.
+
+Usage: python bench_engines.py [turns] [concurrency]
+"""
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from fake_llm import start_fake_llm
+
+TURNS = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+
+server = start_fake_llm()
+
+# Point the app at the fake server and a scratch DB before importing it
+db_dir = tempfile.mkdtemp()
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{db_dir}/bench.db",
+    "OPEN_ROUTER_BASE_URL": f"http://127.0.0.1:{server.server_port}/v1",
+    "OPENAI_API_KEY": "bench",
+    "OPENAI_MODEL": "bench-model",
+    "OPENAI_FALLBACK_MODELS": "",
+})
+
+from config.db import init_db  # noqa: E402
+from memory.sqlite import InitHistoryStore  # noqa: E402
+from llms.direct import close_http_client  # noqa: E402
+from agent import handlers  # noqa: E402
+
+
+# ============================================================
+# Benchmark
+# ============================================================
+async def run_session(session_id: int, latencies: list):
+    for turn in range(TURNS):
+        started = time.perf_counter()
+        await handlers.get_agent_response(session_id, "hobbies", f"I like hiking, turn {turn}")
+        await handlers.get_infer_interests(session_id)
+        latencies.append(time.perf_counter() - started)
+
+
+async def bench(engine: str, first_session_id: int):
+    handlers.LLM_ENGINE = engine
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*[
+        run_session(first_session_id + i, latencies) for i in range(CONCURRENCY)
+    ])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "engine": engine,
+        "turns": len(latencies),
+        "turns_per_s": len(latencies) / elapsed,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    init_db()
+    InitHistoryStore()
+
+    # Warm up both paths (imports, connection pools, table creation)
+    for engine in ("langchain", "direct"):
+        handlers.LLM_ENGINE = engine
+        await handlers.get_agent_response(0, "warmup", "hello")
+
+    results = [
+        await bench("langchain", 1000),
+        await bench("direct", 2000),
+    ]
+    await close_http_client()
+
+    print(f"{TURNS} turns x {CONCURRENCY} concurrent sessions (reply + interest inference per turn)")
+    print(f"{'engine':<10} {'turns':>6} {'turns/s':>9} {'mean ms':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for r in results:
+        print(f"{r['engine']:<10} {r['turns']:>6} {r['turns_per_s']:>9.1f} "
+              f"{r['mean_ms']:>9.2f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
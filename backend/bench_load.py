@@ -0,0 +1,159 @@
+"""
+Load benchmark for multi-worker mode with sharded SQLite storage.
+
+For each worker count W it starts a fake LLM server and the app via
+`uvicorn --workers W` with DB_SHARDS=W on a scratch directory, then drives
+concurrent clients through start-session + several send-message calls and
+reports request throughput and the app's CPU time per request.
+
+Throughput can only scale with W while there are more than W free cores:
+the fake LLM server and this load generator need CPU too. Per-request CPU
+time is the portable signal. If it stays flat as W grows, shards add no
+contention, and the CPU-bound ceiling is about cores / cpu_per_request.
+
+Environment variables such as LLM_ENGINE=direct are passed through to the app.
+
+Usage: python bench_load.py [max_workers] [clients] [turns]
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+MAX_WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+CLIENTS = int(sys.argv[2]) if len(sys.argv) > 2 else 32
+TURNS = int(sys.argv[3]) if len(sys.argv) > 3 else 5
+
+MESSAGES = ["I like hiking", "Mostly mountains", "I also take photos", "yes", "Cooking too"]
+
+
+def server_cpu_seconds(pid: int):
+    """
+    User + system CPU seconds of a process and its direct children (the
+    uvicorn workers), read from /proc. Returns None where /proc is missing.
+    """
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids = [pid] + [int(p) for p in f.read().split()]
+        total = 0
+        for p in pids:
+            with open(f"/proc/{p}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            total += int(fields[11]) + int(fields[12])   # utime + stime
+        return total / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError):
+        return None
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_ready(client: httpx.AsyncClient, url: str):
+    for _ in range(200):
+        try:
+            await client.get(f"{url}/metrics/admission")
+            return
+        except httpx.TransportError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("app did not start")
+
+
+async def run_client(client: httpx.AsyncClient, url: str, counts: dict, created: list):
+    res = await client.post(f"{url}/start-session", json={"prompt": "hobbies", "consent": True})
+    counts[res.status_code] = counts.get(res.status_code, 0) + 1
+    if res.status_code != 200:
+        return
+    session_id = res.json()["sessionId"]
+    created.append(session_id)
+
+    for turn in range(TURNS):
+        res = await client.post(f"{url}/send-message", json={
+            "sessionId": session_id, "message": MESSAGES[turn % len(MESSAGES)],
+        })
+        counts[res.status_code] = counts.get(res.status_code, 0) + 1
+
+
+async def bench(workers: int):
+    llm_port, app_port = free_port(), free_port()
+    data_dir = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{data_dir}/survey.db",
+        DB_SHARDS=str(workers),
+        OPEN_ROUTER_BASE_URL=f"http://127.0.0.1:{llm_port}/v1",
+        OPENAI_API_KEY="bench",
+        OPENAI_MODEL="bench-model",
+        OPENAI_FALLBACK_MODELS="",
+    )
+    here = os.path.dirname(os.path.abspath(__file__))
+    llm = subprocess.Popen([sys.executable, "fake_llm.py", str(llm_port)], cwd=here)
+    app = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(app_port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=here, env=env,
+    )
+    url = f"http://127.0.0.1:{app_port}"
+
+    try:
+        async with httpx.AsyncClient(timeout=120) as client:
+            await wait_ready(client, url)
+
+            counts, created = {}, []
+            cpu_before = server_cpu_seconds(app.pid)
+            started = time.perf_counter()
+            await asyncio.gather(*[
+                run_client(client, url, counts, created) for _ in range(CLIENTS)
+            ])
+            elapsed = time.perf_counter() - started
+            cpu_after = server_cpu_seconds(app.pid)
+
+            # Cross-shard listing should see every session exactly once
+            sessions = (await client.get(f"{url}/sessions")).json()
+            ids = sorted(s["id"] for s in sessions)
+            assert ids == sorted(created), "cross-shard session listing mismatch"
+    finally:
+        app.terminate()
+        llm.terminate()
+        app.wait()
+        llm.wait()
+
+    total = sum(counts.values())
+    cpu_ms = None
+    if cpu_before is not None and cpu_after is not None:
+        cpu_ms = (cpu_after - cpu_before) * 1000 / total
+    return {"workers": workers, "requests": total, "ok": counts.get(200, 0),
+            "shed": counts.get(503, 0), "rps": total / elapsed, "sessions": len(ids),
+            "cpu_ms": cpu_ms}
+
+
+async def main():
+    cores = os.cpu_count()
+    print(f"{CLIENTS} clients x (1 start-session + {TURNS} send-message), "
+          f"{cores} CPU cores available")
+    print(f"{'workers':>7} {'requests':>9} {'ok':>6} {'503':>5} {'sessions':>9} "
+          f"{'req/s':>8} {'speedup':>8} {'cpu ms/req':>11} {'ceiling req/s':>14}")
+    baseline = None
+    workers = 1
+    while workers <= MAX_WORKERS:
+        r = await bench(workers)
+        baseline = baseline or r["rps"]
+        cpu = f"{r['cpu_ms']:.1f}" if r["cpu_ms"] else "n/a"
+        # CPU-bound throughput if every core ran app workers only
+        ceiling = f"{min(workers, cores) * 1000 / r['cpu_ms']:.1f}" if r["cpu_ms"] else "n/a"
+        note = "  (more workers than cores)" if workers > cores else ""
+        print(f"{r['workers']:>7} {r['requests']:>9} {r['ok']:>6} {r['shed']:>5} "
+              f"{r['sessions']:>9} {r['rps']:>8.1f} {r['rps'] / baseline:>7.2f}x "
+              f"{cpu:>11} {ceiling:>14}{note}")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
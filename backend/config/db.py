@@ -1,9 +1,13 @@
 import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import scoped_session, sessionmaker
+import random
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
 from dotenv import load_dotenv
 
 from models.base import Base
+from models.chat import SessionId
 
 
 # ============================================================
@@ -14,20 +18,99 @@ load_dotenv()
 # Read database connection string from environment variable
 DB_CONNECTION_STRING = os.getenv("DATABASE_URL")
 
+# Number of SQLite shard files session data is partitioned across.
+# With 1 shard (default) DATABASE_URL is used as-is.
+DB_SHARDS = int(os.getenv("DB_SHARDS", "1"))
+
+
+def shard_url(index: int):
+    """
+    Derive the connection string for shard `index` from DATABASE_URL,
+    e.g. sqlite:///data/survey.db -> sqlite:///data/survey.shard1.db
+    """
+    if DB_SHARDS == 1:
+        return DB_CONNECTION_STRING
+    root, ext = os.path.splitext(DB_CONNECTION_STRING)
+    return f"{root}.shard{index}{ext}"
+
 
 # ============================================================
-# Create a SQLAlchemy Engine
+# Create one SQLAlchemy Engine per shard
 # ============================================================
 # The engine is the starting point for any SQLAlchemy application.
 # It manages connections to the database and handles SQL execution.
-engine = create_engine(
-    DB_CONNECTION_STRING,
-    # Required for SQLite thread safety
-    connect_args={"check_same_thread": False},
-    pool_size=10,         # Maintain up to 10 persistent DB connections
-    max_overflow=20,      # Allow up to 20 additional temporary connections if pool is full
-    pool_timeout=60       # Wait up to 60 seconds before raising a timeout error
-)
+def _create_engine(url: str):
+    shard_engine = create_engine(
+        url,
+        # Required for SQLite thread safety
+        connect_args={"check_same_thread": False},
+        pool_size=10,         # Maintain up to 10 persistent DB connections
+        max_overflow=20,      # Allow up to 20 additional temporary connections if pool is full
+        pool_timeout=60       # Wait up to 60 seconds before raising a timeout error
+    )
+
+    @event.listens_for(shard_engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _):
+        # WAL lets readers proceed while another worker process writes;
+        # busy_timeout waits for a lock instead of failing immediately.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA busy_timeout=5000")
+        cursor.close()
+
+    return shard_engine
+
+
+engines = [_create_engine(shard_url(i)) for i in range(DB_SHARDS)]
+session_factories = [
+    sessionmaker(autocommit=False, autoflush=False, bind=e) for e in engines
+]
+
+# Kept for single-database callers; equals the only shard when DB_SHARDS=1
+engine = engines[0]
+
+
+# ============================================================
+# Shard router
+# ============================================================
+def shard_for(session_id: int):
+    """Shard index that owns all data (session, interests, history) of a session."""
+    return int(session_id) % DB_SHARDS
+
+
+def get_engine(session_id: int):
+    """Engine of the shard that owns `session_id`."""
+    return engines[shard_for(session_id)]
+
+
+def shard_session(session_id: int):
+    """
+    New DB session bound to the shard that owns `session_id`.
+    Usable as a context manager: `with shard_session(id) as db: ...`
+    """
+    return session_factories[shard_for(session_id)]()
+
+
+def all_shard_sessions():
+    """One new DB session per shard, for cross-shard fan-out queries."""
+    return [factory() for factory in session_factories]
+
+
+def allocate_session_id(db):
+    """
+    Reserve a globally unique session id on the shard `db` is bound to.
+
+    Each shard hands out local sequence numbers from its own `session_ids`
+    table; the global id is `seq * DB_SHARDS + shard`, so `id % DB_SHARDS`
+    always points back to the owning shard. Returns None with a single
+    shard, leaving id assignment to the database as before.
+    """
+    if DB_SHARDS == 1:
+        return None
+    seq = SessionId()
+    db.add(seq)
+    db.flush()  # Assigns seq.id inside the caller's transaction
+    return seq.id * DB_SHARDS + db.info["shard"]
 
 
 # ============================================================
@@ -35,13 +118,12 @@ engine = create_engine(
 # ============================================================
 def get_db():
     """
-    Creates a scoped session for database operations.
+    Creates a session on a randomly chosen shard (used for new sessions).
     Automatically closes the connection after each request.
     """
-    SessionLocal = scoped_session(
-        sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    )
-    db = SessionLocal()
+    shard = random.randrange(DB_SHARDS)
+    db = session_factories[shard]()
+    db.info["shard"] = shard
 
     try:
         yield db  # Provide session to the request handler
@@ -49,12 +131,78 @@ def get_db():
         db.close()  # Ensure session is closed even if an error occurs
 
 
+def get_shard_db(sessionId: int):
+    """
+    Creates a session on the shard that owns the `sessionId` path parameter.
+    Automatically closes the connection after each request.
+    """
+    db = shard_session(sessionId)
+
+    try:
+        yield db
+    finally:
+        db.close()
+
+
 # ============================================================
 # Initialize database tables (called during app startup)
 # ============================================================
 def init_db():
     """
-    Creates all tables defined in SQLAlchemy models (via Base.metadata).
+    Creates all tables defined in SQLAlchemy models (via Base.metadata) on every shard.
     Should be run once at application startup.
     """
-    Base.metadata.create_all(bind=engine)
+    check_unsharded_data()
+    for shard_engine in engines:
+        create_tables(Base.metadata, shard_engine)
+
+
+def create_tables(metadata, bind, attempts: int = 10):
+    """
+    create_all() that tolerates other worker processes creating the same
+    tables concurrently: "already exists" errors are retried, and each retry
+    skips the tables that now exist.
+    """
+    for attempt in range(attempts):
+        try:
+            metadata.create_all(bind=bind, checkfirst=True)
+            return
+        except OperationalError as e:
+            if "already exists" not in str(e) or attempt == attempts - 1:
+                raise
+
+
+def unsharded_session_count():
+    """
+    Number of sessions stored in the plain DATABASE_URL file (0 if it doesn't exist).
+    With DB_SHARDS > 1 that file is never read, so any sessions there are orphaned.
+    """
+    database = make_url(DB_CONNECTION_STRING).database
+    if not database or not os.path.exists(database):
+        return 0
+
+    legacy = create_engine(DB_CONNECTION_STRING)
+    try:
+        if not inspect(legacy).has_table("sessions"):
+            return 0
+        with legacy.connect() as conn:
+            return conn.execute(text("SELECT COUNT(*) FROM sessions")).scalar()
+    finally:
+        legacy.dispose()
+
+
+def check_unsharded_data():
+    """
+    Refuse to start in sharded mode while the unsharded database still holds
+    sessions: their ids don't follow `seq * DB_SHARDS + shard`, so they would
+    silently disappear. Run `python migrate_shards.py` first.
+    """
+    if DB_SHARDS == 1:
+        return
+    count = unsharded_session_count()
+    if count:
+        raise RuntimeError(
+            f"DB_SHARDS={DB_SHARDS} but {DB_CONNECTION_STRING} still holds {count} "
+            "session(s). Run `python migrate_shards.py` to move them into the shards, "
+            "or set DB_SHARDS=1."
+        )
@@ -0,0 +1,63 @@
+"""
+Fake OpenAI-compatible LLM server for benchmarks.
+
+Answers `/chat/completions` instantly (or after `latency` seconds) with a
+canned question, or a canned interest list for inference prompts.
+
+Usage: python fake_llm.py [port] [latency_seconds]
+"""
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+INTERESTS = json.dumps([
+    {"name": "outdoors", "confidence": 0.8, "rationale": "Mentions hiking"},
+])
+
+
+def make_handler(latency: float = 0.0):
+    class FakeLLM(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            prompt = body["messages"][-1]["content"]
+            content = INTERESTS if "infer 3–5" in prompt else "What do you enjoy most about that?"
+            if latency:
+                time.sleep(latency)
+            payload = json.dumps({
+                "id": "chatcmpl-bench",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body["model"],
+                "choices": [{
+                    "index": 0,
+                    "message": {"role": "assistant", "content": content},
+                    "finish_reason": "stop",
+                }],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return FakeLLM
+
+
+def start_fake_llm(port: int = 0, latency: float = 0.0):
+    """Serve the fake LLM on a background thread and return the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+    ThreadingHTTPServer(("127.0.0.1", port), make_handler(latency)).serve_forever()
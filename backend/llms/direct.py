@@ -0,0 +1,61 @@
+import httpx
+
+from .openai import OpenAIChatConfig
+
+# Default endpoint when no gateway base URL is configured
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+# Used when a config has no timeout: passing None to httpx disables timeouts
+DEFAULT_TIMEOUT = 30.0
+
+# Shared connection pool for every direct LLM call (created lazily)
+_client = None
+
+
+def get_http_client():
+    """Return the process-wide async HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_http_client():
+    """Close the shared client (called on application shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class DirectChatModel:
+    """
+    Minimal OpenAI-compatible chat client without LangChain.
+
+    Sends a list of {"role", "content"} dicts to `/chat/completions` and
+    returns the assistant's text. Exposes `ainvoke` so it can be used as a
+    route inside ModelRouter (fallback and hedging work the same way).
+    """
+
+    def __init__(self, config: OpenAIChatConfig):
+        self.config = config
+        self.url = f"{(config.base_url or DEFAULT_BASE_URL).rstrip('/')}/chat/completions"
+        self.headers = {"Authorization": f"Bearer {config.api_key}"}
+        # Always finite, so a stalled provider can't pin an admission slot forever
+        self.timeout = httpx.Timeout(
+            config.timeout if config.timeout is not None else DEFAULT_TIMEOUT)
+
+    async def ainvoke(self, messages: list, config=None, **kwargs):
+        response = await get_http_client().post(
+            self.url,
+            headers=self.headers,
+            json={
+                "model": self.config.model,
+                "messages": messages,
+                "temperature": self.config.temperature,
+            },
+            timeout=self.timeout,
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"]["content"] or ""
@@ -13,6 +13,12 @@ openai_api_key = os.getenv("OPENAI_API_KEY")
 openai_model_name = os.getenv("OPENAI_MODEL")
 # Optional base URL for OpenRouter or other gateways
 base_url = os.getenv("OPEN_ROUTER_BASE_URL")
+# Per-request timeout (seconds) so a stalled provider surfaces as an error
+request_timeout = float(os.getenv("OPENAI_TIMEOUT", "30"))
+# Client-side retries per request (unset = 2 for a single route, 0 when the
+# router has fallback routes, so a failing route hands over immediately)
+max_retries = int(os.getenv("OPENAI_MAX_RETRIES")) if os.getenv(
+    "OPENAI_MAX_RETRIES") else None
 
 
 @dataclass
@@ -27,6 +33,10 @@ class OpenAIChatConfig:
     base_url: str = base_url
     # Controls randomness in model responses
     temperature: float = 0.3
+    # Request timeout in seconds (always finite, see OPENAI_TIMEOUT)
+    timeout: float = request_timeout
+    # Client-side retries per request (None = ChatOpenAI default of 2)
+    max_retries: int = max_retries
 
 
 def OpenAIChatModel(config: OpenAIChatConfig):
@@ -45,4 +55,7 @@ def OpenAIChatModel(config: OpenAIChatConfig):
         base_url=config.base_url,                      # Optional custom endpoint
         # Control creativity in responses
         temperature=config.temperature,
+        timeout=config.timeout,                        # Fail fast so routing can fall back
+        # Retries on the same route before the error reaches the router
+        max_retries=2 if config.max_retries is None else config.max_retries,
     )
@@ -0,0 +1,271 @@
+import os
+import asyncio
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from dotenv import load_dotenv
+from langchain_core.runnables import Runnable
+
+from .openai import OpenAIChatModel, OpenAIChatConfig
+
+# Load environment variables from the .env file into the system environment
+load_dotenv()
+
+# Comma-separated backup routes tried after the primary OPENAI_MODEL.
+# Each entry is "model" (same gateway) or "model@base_url" (different endpoint),
+# e.g. "anthropic/claude-3-haiku,gpt-4o-mini@https://api.openai.com/v1"
+fallback_models = os.getenv("OPENAI_FALLBACK_MODELS", "")
+# Retry the next route when a route errors or times out
+fallback_enabled = os.getenv("LLM_FALLBACK", "true").lower() == "true"
+# Fire a backup request when the primary is slower than its p95
+hedge_enabled = os.getenv("LLM_HEDGE", "false").lower() == "true"
+# Fixed hedge delay in seconds (unset = adapt to the primary's observed p95)
+hedge_delay = float(os.getenv("LLM_HEDGE_DELAY")) if os.getenv(
+    "LLM_HEDGE_DELAY") else None
+# Chains allowed to hedge when LLM_HEDGE is on. Interest inference sends the
+# longest prompts, so by default only the conversation chain hedges.
+hedge_chains = {c.strip() for c in os.getenv(
+    "LLM_HEDGE_CHAINS", "conversation").split(",") if c.strip()}
+
+# Chains that each get their own router, policy and latency stats
+CHAINS = ("conversation", "inference", "prompt_generator")
+
+
+@dataclass
+class RoutePolicy:
+    """
+    Routing policy of one chain, shared by every route in that chain's ModelRouter.
+    """
+    # Try the next route when the current one raises (errors and timeouts)
+    fallback: bool = fallback_enabled
+    # Start a backup request if the running one is slower than the hedge delay
+    hedge: bool = hedge_enabled
+    # Fixed hedge delay in seconds; None means "use the route's p95 latency"
+    hedge_delay: float = hedge_delay
+    # Delay used until a route has enough samples for a meaningful p95
+    default_hedge_delay: float = 3.0
+    # Number of successful calls required before trusting the observed p95
+    min_samples: int = 20
+
+
+@dataclass
+class RouteStats:
+    """
+    Rolling latency and outcome counters for a single route.
+    """
+    name: str
+    calls: int = 0       # Requests started on this route
+    wins: int = 0        # Requests whose answer was returned to the caller
+    errors: int = 0      # Requests that raised (including timeouts)
+    cancelled: int = 0   # Hedged requests cancelled because another route won
+    hedges: int = 0      # Times this route was started as a hedge
+    latencies: deque = field(default_factory=lambda: deque(maxlen=500))
+
+    def percentile(self, pct: float):
+        """Return the given latency percentile in seconds, or None without samples."""
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def snapshot(self):
+        """Serializable view of the counters (latencies in milliseconds)."""
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+
+        return {
+            "route": self.name,
+            "calls": self.calls,
+            "wins": self.wins,
+            "errors": self.errors,
+            "cancelled": self.cancelled,
+            "hedges": self.hedges,
+            "samples": len(self.latencies),
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+        }
+
+
+# ============================================================
+# Model router: ordered fallback + optional hedged requests
+# ============================================================
+class ModelRouter(Runnable):
+    """
+    LCEL-compatible runnable that spreads a request over an ordered list of
+    OpenAI-compatible model configs.
+
+    - Fallback: if a route errors or times out, the next route is tried.
+    - Hedging: if a route is still running after its hedge delay (its p95 by
+      default), the next route is started in parallel; the first successful
+      answer wins and the other request is cancelled.
+    """
+
+    def __init__(self, configs: list[OpenAIChatConfig], policy: RoutePolicy = None,
+                 factory=OpenAIChatModel):
+        if not configs:
+            raise ValueError("ModelRouter requires at least one route config")
+
+        self.policy = policy or RoutePolicy()
+        self.routes = []
+        for config in configs:
+            name = config.model if not config.base_url else f"{config.model}@{config.base_url}"
+            self.routes.append((factory(config), RouteStats(name=name)))
+
+    @classmethod
+    def from_env(cls, config: OpenAIChatConfig, policy: RoutePolicy = None,
+                 factory=OpenAIChatModel):
+        """
+        Build a router from the primary config plus OPENAI_FALLBACK_MODELS.
+
+        Args:
+            config (OpenAIChatConfig): Primary route; backups inherit its key,
+                base URL, temperature and timeout unless overridden.
+            policy (RoutePolicy): Optional routing policy (defaults from env).
+            factory (callable): Builds a client from a config; any object with
+                an async `ainvoke(input, config)` works (default: ChatOpenAI).
+
+        With backup routes configured, routes without an explicit
+        OPENAI_MAX_RETRIES get max_retries=0 so errors fall back immediately.
+        """
+        configs = [config]
+        for entry in filter(None, (e.strip() for e in fallback_models.split(","))):
+            model_name, _, url = entry.partition("@")
+            configs.append(replace(config, model=model_name,
+                           base_url=url or config.base_url))
+        if len(configs) > 1:
+            # Let the router move on instead of retrying a failing route in-client
+            configs = [c if c.max_retries is not None else replace(c, max_retries=0)
+                       for c in configs]
+        return cls(configs, policy, factory)
+
+    # ----------------------------
+    # Helpers
+    # ----------------------------
+    def _hedge_delay(self, stats: RouteStats):
+        # Fixed delay wins; otherwise use the route's p95 once it has enough samples
+        if self.policy.hedge_delay is not None:
+            return self.policy.hedge_delay
+        if len(stats.latencies) < self.policy.min_samples:
+            return self.policy.default_hedge_delay
+        return stats.percentile(95)
+
+    async def _call(self, index: int, input, config, **kwargs):
+        llm, stats = self.routes[index]
+        stats.calls += 1
+        started = time.perf_counter()
+        try:
+            result = await llm.ainvoke(input, config, **kwargs)
+        except asyncio.CancelledError:
+            # Losing hedge: latency is unknown, so it is not recorded
+            stats.cancelled += 1
+            raise
+        except Exception:
+            stats.errors += 1
+            raise
+        stats.latencies.append(time.perf_counter() - started)
+        return result
+
+    # ----------------------------
+    # Runnable interface
+    # ----------------------------
+    def invoke(self, input, config=None, **kwargs):
+        # Synchronous path: sequential fallback only (no hedging without an event loop)
+        last_error = None
+        for llm, stats in self.routes:
+            stats.calls += 1
+            started = time.perf_counter()
+            try:
+                result = llm.invoke(input, config, **kwargs)
+            except Exception as e:
+                stats.errors += 1
+                last_error = e
+                if not self.policy.fallback:
+                    break
+                continue
+            stats.latencies.append(time.perf_counter() - started)
+            stats.wins += 1
+            return result
+        raise last_error
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        pending = {}      # task -> route index
+        next_index = 0
+        last_error = None
+
+        def launch(hedged=False):
+            nonlocal next_index
+            task = asyncio.create_task(
+                self._call(next_index, input, config, **kwargs))
+            pending[task] = next_index
+            if hedged:
+                self.routes[next_index][1].hedges += 1
+            next_index += 1
+
+        launch()
+        try:
+            while pending:
+                # Only wait with a timeout when a hedge could still be fired
+                timeout = None
+                if self.policy.hedge and next_index < len(self.routes):
+                    newest = max(pending.values())
+                    timeout = self._hedge_delay(self.routes[newest][1])
+
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Running route exceeded its hedge delay: start the next one too
+                    launch(hedged=True)
+                    continue
+
+                for task in done:
+                    index = pending.pop(task)
+                    if task.exception() is None:
+                        self.routes[index][1].wins += 1
+                        return task.result()
+                    last_error = task.exception()
+                    print(f"LLM route {self.routes[index][1].name} failed:", last_error)
+
+                # Everything in flight failed: fall back to the next route
+                if not pending and self.policy.fallback and next_index < len(self.routes):
+                    launch()
+        finally:
+            # Cancel any losing or abandoned requests
+            for task in pending:
+                task.cancel()
+
+        raise last_error
+
+    # ----------------------------
+    # Metrics
+    # ----------------------------
+    def stats(self):
+        """Per-route latency and win counts, in priority order."""
+        return [stats.snapshot() for _, stats in self.routes]
+
+
+# ============================================================
+# Per-chain routers
+# ============================================================
+def chain_policy(chain: str):
+    """
+    Routing policy for `chain`: fallback as configured, hedging only when
+    LLM_HEDGE is on and the chain is listed in LLM_HEDGE_CHAINS.
+    """
+    return RoutePolicy(hedge=hedge_enabled and chain in hedge_chains)
+
+
+def chain_routers(config: OpenAIChatConfig, factory=OpenAIChatModel):
+    """
+    Build one ModelRouter per chain in CHAINS.
+
+    Each chain keeps its own policy and RouteStats, so a p95-based hedge delay
+    is derived from that chain's latencies only (short prompt-generator calls
+    don't lower the delay used for long inference calls).
+
+    Returns:
+        dict[str, ModelRouter]: Routers keyed by chain name.
+    """
+    return {chain: ModelRouter.from_env(config, chain_policy(chain), factory)
+            for chain in CHAINS}
@@ -1,14 +1,25 @@
+import os
 import uvicorn
 from fastapi import FastAPI, Depends, HTTPException
 from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session as DBSession
 
-from config.db import get_db, init_db
+from config.db import (
+    get_db, get_shard_db, init_db, shard_session, all_shard_sessions, allocate_session_id,
+)
 from models.chat import Session, Interest
-from agent.handlers import get_agent_response, get_infer_interests, prompt_generator
-from memory.sqlite import ClearMemory, GetHistory
+from agent.handlers import (
+    get_agent_response, get_infer_interests, prompt_generator, get_route_stats,
+    should_infer_interests, get_gate_stats,
+)
+from memory.sqlite import ClearMemory, GetHistory, InitHistoryStore
+from llms.direct import close_http_client
+from utils.admission import (
+    admission, Overloaded, retry_after, PRIORITY_ACTIVE_SESSION, PRIORITY_NEW_SESSION,
+)
 
 
 # ============================================================
@@ -18,13 +29,50 @@ from memory.sqlite import ClearMemory, GetHistory
 async def lifespan(app: FastAPI):
     # Initialize the database before serving any requests
     init_db()
+    InitHistoryStore()
     print("Database initialized on startup")
     yield  # Control returns to FastAPI for serving requests
+    # Release pooled connections held by the direct LLM engine
+    await close_http_client()
 
 
 # Initialize FastAPI app with lifespan hook
 app = FastAPI(lifespan=lifespan)
 
+
+# ============================================================
+# Middleware: Admission control for LLM-bound endpoints
+# ============================================================
+# In-progress sessions are served before new ones; cheap read endpoints
+# (/interests, /session, ...) are not listed and bypass admission entirely.
+ADMISSION_PRIORITIES = {
+    "/send-message": PRIORITY_ACTIVE_SESSION,
+    "/start-session": PRIORITY_NEW_SESSION,
+}
+
+
+# Registered before CORS so that 503 responses still carry CORS headers
+@app.middleware("http")
+async def admission_control(request, call_next):
+    priority = ADMISSION_PRIORITIES.get(request.url.path)
+    if priority is None or request.method != "POST":
+        return await call_next(request)
+
+    try:
+        await admission.acquire(priority)
+    except Overloaded as e:
+        # Fail fast instead of letting the request queue until the client times out
+        return JSONResponse(
+            status_code=503,
+            content={"detail": f"Server busy: {e}"},
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    try:
+        return await call_next(request)
+    finally:
+        admission.release()
+
 # Enable CORS for local frontend (Vite/React apps)
 app.add_middleware(
     CORSMiddleware,
@@ -65,8 +113,9 @@ async def start_session(data: StartSession, db: DBSession = Depends(get_db)):
     # Create a dynamic prompt based on the user query
     prompt = await prompt_generator(data.prompt)
 
-    # Create and persist a new chat session
-    session = Session(prompt=prompt, consent=data.consent, paused=False)
+    # Create and persist a new chat session on the shard picked by get_db
+    session = Session(id=allocate_session_id(db), prompt=prompt,
+                      consent=data.consent, paused=False)
     db.add(session)
     db.commit()
     db.refresh(session)
@@ -81,34 +130,43 @@ async def start_session(data: StartSession, db: DBSession = Depends(get_db)):
 # Send a message to the agent and receive its response
 # ============================================================
 @app.post("/send-message")
-async def send_message(data: SendMessage, db: DBSession = Depends(get_db)):
-    # Retrieve session and ensure it's active
-    session = db.query(Session).filter(Session.id == data.sessionId).first()
-    if not session or session.paused:
-        raise HTTPException(404, "Session not found or paused")
-
-    # Get the AI response (automatically updates memory history)
-    agent_message = await get_agent_response(
-        data.sessionId, session.prompt, data.message
-    )
-
-    # Infer user interests based on conversation history
-    interests = await get_infer_interests(data.sessionId)
-
-    # Replace old interests with new ones in the DB
-    db.query(Interest).filter(Interest.session_id == data.sessionId).delete()
-    for int in interests:
-        db.add(Interest(session_id=data.sessionId, **int))
-    db.commit()
+async def send_message(data: SendMessage):
+    # All of this session's data lives on the shard that owns its id
+    with shard_session(data.sessionId) as db:
+        # Retrieve session and ensure it's active
+        session = db.query(Session).filter(Session.id == data.sessionId).first()
+        if not session or session.paused:
+            raise HTTPException(404, "Session not found or paused")
+
+        # Get the AI response (automatically updates memory history)
+        agent_message = await get_agent_response(
+            data.sessionId, session.prompt, data.message
+        )
+
+        # Skip inference when the message adds no new signal (e.g. "yes", "ok thanks")
+        current = db.query(Interest).filter(
+            Interest.session_id == data.sessionId).all()
+        current = [{"name": i.name, "rationale": i.rationale} for i in current]
+        if not should_infer_interests(data.sessionId, data.message, current):
+            return {"agentMessage": agent_message}
+
+        # Infer user interests based on conversation history
+        interests = await get_infer_interests(data.sessionId)
+
+        # Replace old interests with new ones in the DB
+        db.query(Interest).filter(Interest.session_id == data.sessionId).delete()
+        for int in interests:
+            db.add(Interest(session_id=data.sessionId, **int))
+        db.commit()
 
-    return {"agentMessage": agent_message}
+        return {"agentMessage": agent_message}
 
 
 # ============================================================
 # Retrieve inferred interests for a specific session
 # ============================================================
 @app.get("/interests/{sessionId}")
-async def get_interests(sessionId: int, db: DBSession = Depends(get_db)):
+async def get_interests(sessionId: int, db: DBSession = Depends(get_shard_db)):
     interests = (
         db.query(Interest)
         .filter(Interest.session_id == sessionId)
@@ -127,7 +185,7 @@ async def get_interests(sessionId: int, db: DBSession = Depends(get_db)):
 # Pause a session (temporarily disable chat)
 # ============================================================
 @app.post("/pause/{sessionId}")
-async def pause_session(sessionId: int, db: DBSession = Depends(get_db)):
+async def pause_session(sessionId: int, db: DBSession = Depends(get_shard_db)):
     session = db.query(Session).filter(Session.id == sessionId).first()
     if session:
         session.paused = True
@@ -139,7 +197,7 @@ async def pause_session(sessionId: int, db: DBSession = Depends(get_db)):
 # Resume a previously paused session
 # ============================================================
 @app.post("/resume/{sessionId}")
-async def resume_session(sessionId: int, db: DBSession = Depends(get_db)):
+async def resume_session(sessionId: int, db: DBSession = Depends(get_shard_db)):
     session = db.query(Session).filter(Session.id == sessionId).first()
     if session:
         session.paused = False
@@ -151,7 +209,7 @@ async def resume_session(sessionId: int, db: DBSession = Depends(get_db)):
 # Retrieve session info (used to check session state)
 # ============================================================
 @app.get("/session/{sessionId}")
-async def get_session(sessionId: int, db: DBSession = Depends(get_db)):
+async def get_session(sessionId: int, db: DBSession = Depends(get_shard_db)):
     """
     Fetch a session by ID — verifies its existence and status.
     """
@@ -170,7 +228,7 @@ async def get_session(sessionId: int, db: DBSession = Depends(get_db)):
 # Delete a session and all related data
 # ============================================================
 @app.delete("/session/{sessionId}")
-async def delete_session(sessionId: int, db: DBSession = Depends(get_db)):
+async def delete_session(sessionId: int, db: DBSession = Depends(get_shard_db)):
     # Fetch the session first
     session = db.query(Session).filter(
         Session.id == sessionId, Session.deleted == False).first()
@@ -196,9 +254,13 @@ async def delete_session(sessionId: int, db: DBSession = Depends(get_db)):
 # List all existing sessions
 # ============================================================
 @app.get("/sessions")
-async def get_sessions(db: DBSession = Depends(get_db)):
-    sessions = db.query(Session).filter(Session.deleted == False).all()
-    return sessions
+async def get_sessions():
+    # Sessions are spread across shards: query each one and merge by id
+    sessions = []
+    for db in all_shard_sessions():
+        with db:
+            sessions += db.query(Session).filter(Session.deleted == False).all()
+    return sorted(sessions, key=lambda s: s.id)
 
 
 # ============================================================
@@ -226,8 +288,35 @@ def get_last_messages(sessionId: int, limit: int = 100):
     return {"session_id": sessionId, "messages": formatted}
 
 
+# ============================================================
+# LLM routing metrics (per-chain, per-route latency and win counts)
+# ============================================================
+@app.get("/metrics/llm-routes")
+async def get_llm_routes():
+    return {"chains": get_route_stats()}
+
+
+# ============================================================
+# Interest inference gate metrics (skipped vs. executed)
+# ============================================================
+@app.get("/metrics/inference")
+async def get_inference_metrics():
+    return get_gate_stats()
+
+
+# ============================================================
+# Admission control metrics (in-flight, queued, shed)
+# ============================================================
+@app.get("/metrics/admission")
+async def get_admission_metrics():
+    return admission.stats()
+
+
 # ============================================================
 # Run FastAPI app using Uvicorn
 # ============================================================
+# Set WEB_CONCURRENCY > 1 (ideally with DB_SHARDS >= WEB_CONCURRENCY) to run
+# several worker processes; each one serves requests for every shard.
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    workers = int(os.getenv("WEB_CONCURRENCY", "1"))
+    uvicorn.run("main:app", host="0.0.0.0", port=8000, workers=workers)
@@ -1,8 +1,20 @@
+import json
+from sqlalchemy import Column, Integer, MetaData, Table, Text, insert, select
 from langchain.memory import ConversationBufferMemory
 from langchain_community.chat_message_histories import SQLChatMessageHistory
 
 from utils.constants import CHAT_HISTORY_KEY, INPUT_KEY
-from config.db import engine
+from config.db import engines, get_engine, create_tables
+
+
+# Same layout SQLChatMessageHistory uses, so both engines share one history table
+history_table = Table(
+    CHAT_HISTORY_KEY,
+    MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("session_id", Text),
+    Column("message", Text),   # JSON: {"type": "human"|"ai", "data": {"content": ...}}
+)
 
 
 # ============================================================
@@ -22,7 +34,7 @@ def GetHistory(session_id: int):
     history = SQLChatMessageHistory(
         # Ensure session_id is string for DB compatibility
         session_id=str(session_id),
-        connection=engine,           # Active SQLAlchemy DB engine
+        connection=get_engine(session_id),  # Engine of the shard owning this session
         # Table name constant (e.g., "chat_history")
         table_name=CHAT_HISTORY_KEY
     )
@@ -74,3 +86,70 @@ def ClearMemory(session_id: int):
         history.clear()  # Removes all stored chat records for this session
     except Exception as e:
         print(f"Failed to clear chat memory for session {session_id}: {e}")
+
+
+# ============================================================
+# Lightweight history store (used by the direct LLM engine)
+# ============================================================
+def InitHistoryStore():
+    """
+    Create the chat history table on every shard if it doesn't exist yet.
+    SQLChatMessageHistory does this lazily; the direct engine needs it up front.
+    """
+    for shard_engine in engines:
+        create_tables(history_table.metadata, shard_engine)
+
+
+def LoadMessages(session_id: int, limit: int = None):
+    """
+    Load a session's chat history as plain (role, content) pairs, oldest first.
+
+    Args:
+        session_id (int): Unique identifier for the conversation session.
+        limit (int): Only return the most recent `limit` non-blank messages (None = all).
+
+    Returns:
+        list[tuple[str, str]]: ("human" | "ai", content) pairs, blank messages skipped.
+    """
+    query = (
+        select(history_table.c.message)
+        .where(history_table.c.session_id == str(session_id))
+        .order_by(history_table.c.id.desc())
+    )
+
+    # Walk newest-first and stop once `limit` real messages are found, so
+    # blank rows left by older versions don't shrink the window
+    messages = []
+    with get_engine(session_id).connect() as conn:
+        for raw in conn.execute(query).scalars():
+            message = json.loads(raw)
+            content = message["data"].get("content") or ""
+            if content.strip():
+                messages.append((message["type"], content))
+                if limit and len(messages) >= limit:
+                    break
+
+    messages.reverse()
+    return messages
+
+
+def AppendMessages(session_id: int, messages: list):
+    """
+    Append (role, content) pairs to a session's history in a single transaction.
+
+    Rows are stored in the SQLChatMessageHistory JSON format so they remain
+    readable by GetHistory/GetMemory and the messages endpoint.
+    """
+    rows = [
+        {
+            "session_id": str(session_id),
+            "message": json.dumps({"type": role, "data": {"content": content, "type": role}}),
+        }
+        for role, content in messages
+        if content.strip()
+    ]
+    if not rows:
+        return
+
+    with get_engine(session_id).begin() as conn:
+        conn.execute(insert(history_table), rows)
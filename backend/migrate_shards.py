@@ -0,0 +1,119 @@
+"""
+Move sessions from the unsharded DATABASE_URL file into DB_SHARDS shard files.
+
+Shard routing relies on `id % DB_SHARDS`, which old auto-increment ids don't
+follow, so every session gets a new globally unique id. Its interests and chat
+history move with it. The old -> new id mapping is printed and saved next to
+the database, and the old file is renamed to `*.migrated` so the app will start.
+
+The id map is updated after every session, so a run that fails partway can
+simply be repeated: sessions already present in the shards are skipped
+instead of being copied again under new ids.
+
+Usage: DB_SHARDS=4 python migrate_shards.py
+"""
+import json
+import os
+
+from sqlalchemy import create_engine, insert, select, text
+
+from config.db import (
+    DB_CONNECTION_STRING, DB_SHARDS, engines, session_factories, allocate_session_id,
+    create_tables, shard_session, unsharded_session_count,
+)
+from memory.sqlite import history_table
+from models.base import Base
+from models.chat import Session, Interest
+
+
+def load_id_map(path: str):
+    """Old -> new id map from a previous (possibly interrupted) run, or {}."""
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return {int(old): new for old, new in json.load(f).items()}
+
+
+def save_id_map(path: str, mapping: dict):
+    # Write to a temp file and swap it in, so a crash never leaves a truncated map
+    with open(f"{path}.tmp", "w") as f:
+        json.dump(mapping, f, indent=2)
+    os.replace(f"{path}.tmp", path)
+
+
+def already_migrated(new_id):
+    """Whether the mapped session was actually committed to its shard."""
+    if new_id is None:
+        return False
+    with shard_session(new_id) as db:
+        return db.get(Session, new_id) is not None
+
+
+def migrate():
+    if DB_SHARDS == 1:
+        print("DB_SHARDS is 1: nothing to migrate.")
+        return
+    if not unsharded_session_count():
+        print(f"No sessions in {DB_CONNECTION_STRING}: nothing to migrate.")
+        return
+
+    for shard_engine in engines:
+        create_tables(Base.metadata, shard_engine)
+        create_tables(history_table.metadata, shard_engine)
+
+    legacy = create_engine(DB_CONNECTION_STRING)
+    database = legacy.url.database
+    map_path = f"{database}.id-map.json"
+    mapping = load_id_map(map_path)
+    with legacy.connect() as conn:
+        has_history = legacy.dialect.has_table(conn, history_table.name)
+        sessions = conn.execute(select(Session.__table__).order_by(Session.id)).mappings().all()
+
+        for position, old in enumerate(sessions):
+            if already_migrated(mapping.get(old["id"])):
+                print(f"session {old['id']} already migrated as {mapping[old['id']]}, skipping")
+                continue
+
+            # Spread sessions evenly; each shard allocates the new global id
+            shard = position % DB_SHARDS
+            with session_factories[shard]() as db:
+                db.info["shard"] = shard
+                new_id = allocate_session_id(db)
+                db.add(Session(**{**old, "id": new_id}))
+
+                interests = conn.execute(
+                    select(Interest.__table__).where(Interest.session_id == old["id"])
+                ).mappings().all()
+                for interest in interests:
+                    db.add(Interest(**{**interest, "id": None, "session_id": new_id}))
+
+                if has_history:
+                    rows = conn.execute(
+                        select(history_table.c.message)
+                        .where(history_table.c.session_id == str(old["id"]))
+                        .order_by(history_table.c.id)
+                    ).scalars().all()
+                    if rows:
+                        db.execute(insert(history_table), [
+                            {"session_id": str(new_id), "message": raw} for raw in rows
+                        ])
+
+                # Record the new id before committing: if the commit never
+                # happens, the rerun sees the id missing from its shard and
+                # migrates the session again; if it does, the rerun skips it.
+                mapping[old["id"]] = new_id
+                save_id_map(map_path, mapping)
+                db.commit()
+
+            print(f"session {old['id']} -> {new_id} (shard {shard})")
+
+        # Fold any WAL contents into the main file before renaming it
+        conn.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+    legacy.dispose()
+
+    os.rename(database, f"{database}.migrated")
+    print(f"Migrated {len(mapping)} session(s); id map written to {map_path}")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -44,3 +44,13 @@ class Interest(Base):
 
     # Indicates if the session is soft deleted
     deleted = Column(Boolean, default=False)
+
+
+# Per-shard sequence used to allocate globally unique session ids
+class SessionId(Base):
+    __tablename__ = "session_ids"
+    # AUTOINCREMENT so sequence numbers are never reused, even after deletes
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # Local sequence number; global id = id * DB_SHARDS + shard index
+    id = Column(Integer, primary_key=True)
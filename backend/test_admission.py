@@ -0,0 +1,133 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# main.py builds DB engines and LLM clients at import time
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from utils.admission import AdmissionController, Overloaded  # noqa: E402
+
+HIGH, LOW = 0, 1
+
+
+async def settle():
+    # Give queued waiters a chance to run
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_fast_path_admits_until_full():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=2, max_queue=0, queue_timeout=1)
+        await admission.acquire(LOW)
+        await admission.acquire(LOW)
+        assert admission.stats()["in_flight"] == 2
+
+        with pytest.raises(Overloaded, match="queue full"):
+            await admission.acquire(LOW)
+        admission.release()
+        await admission.acquire(LOW)
+
+        stats = admission.stats()
+        assert (stats["in_flight"], stats["admitted"], stats["shed"]) == (2, 3, 1)
+
+    asyncio.run(scenario())
+
+
+def test_queued_request_gets_released_slot():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+        await admission.acquire(LOW)
+        waiter = asyncio.create_task(admission.acquire(LOW))
+        await settle()
+        assert admission.stats()["queued"] == 1
+
+        admission.release()
+        await waiter
+        assert admission.stats()["in_flight"] == 1 and admission.stats()["queued"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_higher_priority_evicts_lower_priority_waiter():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+        await admission.acquire(LOW)
+        new_session = asyncio.create_task(admission.acquire(LOW))
+        await settle()
+
+        active_session = asyncio.create_task(admission.acquire(HIGH))
+        with pytest.raises(Overloaded, match="evicted"):
+            await new_session
+
+        # Equal priority cannot evict: a second active session is shed
+        with pytest.raises(Overloaded, match="queue full"):
+            await admission.acquire(HIGH)
+
+        admission.release()
+        await active_session
+        assert admission.stats()["shed"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_waiter_is_shed_after_deadline():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=0.05)
+        await admission.acquire(LOW)
+        with pytest.raises(Overloaded, match="deadline"):
+            await admission.acquire(LOW)
+
+        stats = admission.stats()
+        assert (stats["in_flight"], stats["queued"], stats["shed"]) == (1, 0, 1)
+        # The expired waiter must not swallow the next released slot
+        admission.release()
+        assert admission.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_hands_slot_back():
+    async def scenario():
+        admission = AdmissionController(max_in_flight=1, max_queue=2, queue_timeout=1)
+        await admission.acquire(LOW)
+
+        # Cancelled while waiting: nothing is held
+        waiting = asyncio.create_task(admission.acquire(LOW))
+        await settle()
+        waiting.cancel()
+        await settle()
+        assert admission.stats()["queued"] == 0
+
+        # Granted a slot, then cancelled before resuming: the slot is returned
+        granted = asyncio.create_task(admission.acquire(LOW))
+        await settle()
+        admission.release()
+        granted.cancel()
+        await settle()
+        assert granted.cancelled()
+        assert admission.stats()["in_flight"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_middleware_sheds_with_retry_after_and_cors(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    import main
+
+    # A controller with no capacity sheds every LLM-bound request
+    monkeypatch.setattr(main, "admission", AdmissionController(0, 0, 1))
+    client = TestClient(main.app)
+
+    res = client.post(
+        "/start-session",
+        json={"prompt": "hobbies", "consent": True},
+        headers={"Origin": "http://localhost:5173"},
+    )
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == str(main.retry_after)
+    assert res.headers["access-control-allow-origin"] == "http://localhost:5173"
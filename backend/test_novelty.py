@@ -0,0 +1,120 @@
+from collections import Counter
+
+from agent.novelty import should_infer, extract_keywords, gate_stats
+
+TOP_K = 3
+
+# Replayed user side of a typical survey conversation: full-sentence and
+# one-word content answers mixed with acknowledgements.
+TRANSCRIPT = [
+    "Help me discover my hobbies",
+    "I like hiking and camping",
+    "Sounds good",
+    "Mostly in the mountains, hiking with friends on weekends",
+    "absolutely!",
+    "Photography",
+    "Yes, exactly",
+    "I also enjoy photography on those hiking trips",
+    "hmm idk",
+    "Basketball",
+    "yes please",
+    "Lately I have been learning to cook Italian food",
+    "That is correct",
+    "Woodworking",
+    "Cooking pasta and baking bread for friends",
+    "ok thanks, bye",
+]
+
+# Short answers that carry real content and must trigger inference
+ONE_WORD_ANSWERS = [
+    "Photography", "Basketball", "Woodworking", "Painting watercolors", "Tennis, mostly",
+]
+
+# Short replies that must not trigger inference once interests exist
+ACKNOWLEDGEMENTS = [
+    "Sounds good", "Yes, exactly", "absolutely!", "ok thanks, bye", "yes please",
+    "hmm idk", "That is correct", "Not sure", "No", "cool, got it", "sure thing",
+]
+
+
+def fake_infer(messages):
+    """
+    Content-dependent stand-in for LLM inference: keywords are scored by how
+    often and how recently the user mentioned them (a mention in message i
+    weighs i), and the TOP_K best become the interests.
+    """
+    scores = Counter()
+    for position, message in enumerate(messages, start=1):
+        for keyword in extract_keywords(message):
+            scores[keyword] += position
+    return [{"name": name, "rationale": ""} for name, _ in scores.most_common(TOP_K)]
+
+
+def overlap(a, b):
+    """Share of top-k interest names two inference results agree on."""
+    return len({i["name"] for i in a} & {i["name"] for i in b}) / TOP_K
+
+
+def replay(transcript, threshold=None):
+    """
+    Replay a transcript with the novelty gate and with always-run inference.
+
+    Interest quality is the top-k overlap between the gated interests (last
+    executed inference) and the always-run interests after every turn.
+    """
+    gate_stats.update(executed=0, skipped=0)
+    gated, history, overlaps, ran = [], [], [], []
+
+    for turn, message in enumerate(transcript, start=1):
+        run, _ = should_infer(message, history, gated, turn, threshold=threshold)
+        history.append(message)
+        if run:
+            gated = fake_infer(history)
+            ran.append(message)
+        overlaps.append(overlap(gated, fake_infer(history)))
+
+    return dict(gate_stats), sum(overlaps) / len(overlaps), overlaps[-1], ran
+
+
+def test_skips_acknowledgements():
+    prior = ["I like hiking and camping"]
+    interests = [{"name": "hiking", "rationale": "likes hiking and camping"}]
+    for message in ACKNOWLEDGEMENTS:
+        assert not should_infer(message, prior, interests, turn=2)[0], message
+
+
+def test_runs_on_new_content_and_every_n_turns():
+    prior = ["I like hiking"]
+    interests = [{"name": "hiking", "rationale": ""}]
+    assert should_infer("Hiking", [], [], turn=1)[0]
+    assert should_infer("I love photography", prior, interests, turn=2)[0]
+    assert should_infer("Cooking Italian food at home", prior, interests, turn=3)[0]
+    assert should_infer("ok", prior, interests, turn=4)[0]
+    for message in ONE_WORD_ANSWERS:
+        assert should_infer(message, prior, interests, turn=2)[0], message
+
+
+def test_replay_report():
+    stats, mean_overlap, final_overlap, ran = replay(TRANSCRIPT)
+    print(f"\nexecuted={stats['executed']} skipped={stats['skipped']} "
+          f"mean_top{TOP_K}_overlap={mean_overlap:.2f} final_top{TOP_K}_overlap={final_overlap:.2f}")
+
+    # A third or more of the calls are saved, with interests close to always-run inference
+    assert stats["skipped"] >= len(TRANSCRIPT) // 3
+    assert mean_overlap >= 0.8
+    assert final_overlap >= 2 / TOP_K
+    # One-word content answers are never skipped
+    for message in set(TRANSCRIPT) & set(ONE_WORD_ANSWERS):
+        assert message in ran, message
+
+
+def test_replay_overlap_drops_when_content_is_skipped():
+    # Sanity check for the metric: a gate that ignores content (periodic
+    # refresh only) must score visibly worse than the tuned gate.
+    _, mean_overlap, _, _ = replay(TRANSCRIPT, threshold=float("inf"))
+    print(f"\nperiodic-only mean_top{TOP_K}_overlap={mean_overlap:.2f}")
+    assert mean_overlap < 0.8
+
+
+if __name__ == "__main__":
+    test_replay_report()
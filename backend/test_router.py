@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+
+from llms.openai import OpenAIChatConfig
+from llms import router as router_module
+from llms.router import ModelRouter, RoutePolicy, chain_routers
+
+# model name -> (delay in seconds, error to raise or None)
+BEHAVIOUR = {}
+
+
+class FakeRoute:
+    """Route client that sleeps, then answers with its model name or raises."""
+
+    def __init__(self, config: OpenAIChatConfig):
+        self.model = config.model
+
+    async def ainvoke(self, input, config=None, **kwargs):
+        delay, error = BEHAVIOUR[self.model]
+        await asyncio.sleep(delay)
+        if error:
+            raise error
+        return self.model
+
+
+def make_router(routes: dict, **policy):
+    BEHAVIOUR.clear()
+    BEHAVIOUR.update(routes)
+    configs = [OpenAIChatConfig(model=name, base_url=None) for name in routes]
+    return ModelRouter(configs, RoutePolicy(**policy), factory=FakeRoute)
+
+
+def stats(router):
+    return {s["route"]: s for s in router.stats()}
+
+
+async def invoke_and_settle(router):
+    result = await router.ainvoke("hello")
+    # Let cancelled losers run their CancelledError handlers
+    await asyncio.sleep(0.01)
+    return result
+
+
+def test_falls_back_after_error():
+    router = make_router({
+        "primary": (0, RuntimeError("down")),
+        "backup": (0, None),
+    }, fallback=True, hedge=False)
+
+    assert asyncio.run(invoke_and_settle(router)) == "backup"
+    s = stats(router)
+    assert s["primary"]["errors"] == 1 and s["primary"]["wins"] == 0
+    assert s["backup"]["wins"] == 1 and s["backup"]["hedges"] == 0
+
+
+def test_fallback_disabled_reraises():
+    router = make_router({
+        "primary": (0, RuntimeError("down")),
+        "backup": (0, None),
+    }, fallback=False, hedge=False)
+
+    with pytest.raises(RuntimeError, match="down"):
+        asyncio.run(router.ainvoke("hello"))
+    assert stats(router)["backup"]["calls"] == 0
+
+
+def test_hedge_wins_and_primary_is_cancelled():
+    router = make_router({
+        "primary": (1.0, None),
+        "backup": (0.01, None),
+    }, hedge=True, hedge_delay=0.05)
+
+    assert asyncio.run(invoke_and_settle(router)) == "backup"
+    s = stats(router)
+    assert s["backup"]["hedges"] == 1 and s["backup"]["wins"] == 1
+    assert s["primary"]["cancelled"] == 1 and s["primary"]["wins"] == 0
+    # A cancelled request's latency is unknown, so it is not sampled
+    assert s["primary"]["samples"] == 0 and s["backup"]["samples"] == 1
+
+
+def test_fast_primary_does_not_hedge():
+    router = make_router({
+        "primary": (0, None),
+        "backup": (0, None),
+    }, hedge=True, hedge_delay=0.5)
+
+    assert asyncio.run(invoke_and_settle(router)) == "primary"
+    assert stats(router)["backup"]["calls"] == 0
+
+
+def test_primary_fails_while_hedge_is_running():
+    router = make_router({
+        "primary": (0.1, RuntimeError("down")),
+        "backup": (0.2, None),
+    }, hedge=True, hedge_delay=0.05)
+
+    assert asyncio.run(invoke_and_settle(router)) == "backup"
+    s = stats(router)
+    assert s["primary"]["errors"] == 1 and s["primary"]["cancelled"] == 0
+    assert s["backup"]["hedges"] == 1 and s["backup"]["wins"] == 1
+
+
+def test_all_routes_fail_raises_last_error():
+    router = make_router({
+        "primary": (0, RuntimeError("first")),
+        "backup": (0, RuntimeError("second")),
+    }, fallback=True, hedge=False)
+
+    with pytest.raises(RuntimeError, match="second"):
+        asyncio.run(router.ainvoke("hello"))
+
+
+def test_hedge_delay_adapts_to_p95():
+    router = make_router({"primary": (0, None)},
+                         hedge=True, hedge_delay=None, min_samples=5,
+                         default_hedge_delay=3.0)
+    _, primary = router.routes[0]
+
+    assert router._hedge_delay(primary) == 3.0
+    primary.latencies.extend([0.1] * 18 + [1.0] * 2)
+    assert router._hedge_delay(primary) == pytest.approx(1.0)
+
+
+def test_chains_get_their_own_policy_and_stats(monkeypatch):
+    monkeypatch.setattr(router_module, "hedge_enabled", True)
+    monkeypatch.setattr(router_module, "hedge_chains", {"conversation"})
+    BEHAVIOUR.clear()
+    BEHAVIOUR["primary"] = (0, None)
+    routers = chain_routers(OpenAIChatConfig(model="primary", base_url=None),
+                            factory=FakeRoute)
+
+    assert routers["conversation"].policy.hedge
+    assert not routers["inference"].policy.hedge
+    assert not routers["prompt_generator"].policy.hedge
+
+    # Latencies of one chain don't feed another chain's hedge delay
+    asyncio.run(routers["prompt_generator"].ainvoke("hello"))
+    assert routers["prompt_generator"].stats()[0]["samples"] == 1
+    assert routers["inference"].stats()[0]["samples"] == 0
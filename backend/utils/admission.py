@@ -0,0 +1,122 @@
+import os
+import asyncio
+import heapq
+import itertools
+from dotenv import load_dotenv
+
+# Load environment variables from the .env file into the system environment
+load_dotenv()
+
+# Maximum number of LLM-bound requests processed concurrently
+max_in_flight = int(os.getenv("ADMISSION_MAX_IN_FLIGHT", "16"))
+# Maximum number of requests allowed to wait for a free slot
+max_queue = int(os.getenv("ADMISSION_MAX_QUEUE", "32"))
+# How long (seconds) a request may wait in the queue before being shed
+queue_timeout = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "10"))
+# Value of the Retry-After header sent with 503 responses
+retry_after = int(os.getenv("ADMISSION_RETRY_AFTER", "2"))
+
+# Lower value = served first
+PRIORITY_ACTIVE_SESSION = 0
+PRIORITY_NEW_SESSION = 1
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted (queue full or deadline passed)."""
+
+
+# ============================================================
+# Admission controller: bounded in-flight count + priority queue
+# ============================================================
+class AdmissionController:
+    """
+    Limits concurrent LLM-bound requests and sheds load when saturated.
+
+    Requests beyond `max_in_flight` wait in a priority queue (bounded by
+    `max_queue`) for at most `queue_timeout` seconds. When the queue is full,
+    a higher-priority arrival evicts the lowest-priority waiter; otherwise the
+    arrival itself is rejected with `Overloaded`.
+    """
+
+    def __init__(self, max_in_flight: int = max_in_flight, max_queue: int = max_queue,
+                 queue_timeout: float = queue_timeout):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.admitted = 0
+        self.shed = 0
+        self._waiters = []              # heap of (priority, seq, future)
+        self._seq = itertools.count()   # FIFO tie-breaker within a priority
+
+    @property
+    def queued(self):
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    def _evict_lowest(self, priority: int):
+        # Find the lowest-priority (then newest) live waiter worse than `priority`
+        victims = [w for w in self._waiters if not w[2].done() and w[0] > priority]
+        if not victims:
+            return False
+        victim = max(victims, key=lambda w: (w[0], w[1]))
+        victim[2].set_exception(Overloaded("evicted by higher-priority request"))
+        return True
+
+    async def acquire(self, priority: int):
+        # Fast path: free slot and nobody waiting ahead of us
+        if self.in_flight < self.max_in_flight and not self.queued:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        if self.queued >= self.max_queue and not self._evict_lowest(priority):
+            self.shed += 1
+            raise Overloaded("admission queue full")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        try:
+            # The slot is handed over by release(), so in_flight is already counted.
+            # asyncio.wait (unlike wait_for) never swallows our own cancellation.
+            done, _ = await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away: give back a slot we may have just been granted
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release()
+            else:
+                future.cancel()
+            raise
+
+        if not done:
+            future.cancel()
+            self.shed += 1
+            raise Overloaded("admission queue deadline exceeded")
+        if future.exception() is not None:
+            # Evicted by a higher-priority request
+            self.shed += 1
+            raise future.exception()
+        self.admitted += 1
+
+    def release(self):
+        # Hand the slot directly to the best live waiter, if any
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def stats(self):
+        """Current in-flight, queued and shed counts."""
+        return {
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+        }
+
+
+# Shared controller for the LLM-bound endpoints
+admission = AdmissionController()
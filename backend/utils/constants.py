@@ -18,6 +18,7 @@ Your goals:
 Start by greeting the user naturally and asking a simple, engaging question related to {purpose}.
 """
 )
+PROMPT_GENERATOR_TEMPLATE = "Generate a short summary or one-liner based on the following user query: {prompt}"
 AGENT_INFER_PROMPT = """
 Analyze the following conversation history between the user and assistant:
 {history}
@@ -40,3 +41,25 @@ Guidelines:
 - Rank results by confidence descending.
 - Only use clues present in the conversation.
 """
+
+# ============================================================
+# Novelty gate for interest inference
+# ============================================================
+# Minimum novelty score (number of new keywords) to trigger inference.
+# One is enough: one-word answers ("Photography") are the main survey signal.
+NOVELTY_THRESHOLD = 1
+# Always re-run inference at least every N user turns, even without new keywords
+INFER_EVERY_N_TURNS = 4
+# Filler words and acknowledgements that carry no interest signal
+NOVELTY_STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been
+before being but by can could did do does doing don't for from had has have
+having he her here hers him his how i i'd i'll i'm i've if in into is it it's
+its just like me more most my no nor not now of off ok okay on once only or
+other our out over own really same she should so some such than thank thanks
+that that's the their them then there these they this those through to too
+under until up very was we were what when where which while who why will with
+would yeah yep yes you your yours sure maybe guess think know mean kind sort
+lot things thing stuff good great nice cool fine alright right well much many
+absolutely sounds exactly correct please idk hmm bye got
+""".split())